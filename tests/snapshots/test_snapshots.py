@@ -1,9 +1,12 @@
 # Python built-in packages
+import filecmp
 import json
 import os
 import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import redirect_stderr, redirect_stdout
-from datetime import datetime
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal
 
@@ -27,10 +30,32 @@ SETTINGS_FILENAME = "Settings.json"
 DET_DB_SCHEMA = "SNAP"
 ABSOLUTE_TOLERANCE = 1e-8
 RELATIVE_TOLERANCE = 0
+MAX_ASSERTION_WORKERS = min(8, os.cpu_count() or 1)
+MAX_DB_WORKERS = 4
+PROJECT_INPUTS_DIR = paths.ROOT_DIR.joinpath(INPUTS_FOLDER_NAME)
 
 # Load environment variables from local file '.env' (if file exists)
 load_dotenv()
 
+# Shared database instance, created on the first call to _get_db()
+_DB: DetDatabase | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class FilePair:
+    """
+    An output file and its corresponding expected output file.
+
+    Attributes:
+        output_file_dir: Output file directory
+        expected_output_file_dir: Expected output file directory
+        dir_suffix: File path, relative to the (expected) outputs folder
+    """
+
+    output_file_dir: str
+    expected_output_file_dir: str
+    dir_suffix: str
+
 
 def test_snapshots(run_type: Literal["compare", "update", "create"] = "compare"):
     """
@@ -78,11 +103,10 @@ def test_snapshots(run_type: Literal["compare", "update", "create"] = "compare")
         # Print case description, if it exists
         print_case_description(case_dir)
 
-        # Change current working directory
+        # Change current working directory, so that the model reads the inputs of the test case
         os.chdir(case_dir)
 
         # Define folder directories
-        project_inputs_base_dir = paths.ROOT_DIR.joinpath(INPUTS_FOLDER_NAME)
         case_inputs_base_dir = case_dir.joinpath(INPUTS_FOLDER_NAME)
         expected_outputs_base_dir = case_dir.joinpath(EXPECTED_OUTPUTS_FOLDER)
         outputs_base_dir = case_dir.joinpath(OUTPUTS_FOLDER_NAME)
@@ -96,7 +120,7 @@ def test_snapshots(run_type: Literal["compare", "update", "create"] = "compare")
 
         if run_type == "create":
             # Copy inputs folder to test case directory
-            shutil.copytree(src=project_inputs_base_dir, dst=case_inputs_base_dir)
+            shutil.copytree(src=PROJECT_INPUTS_DIR, dst=case_inputs_base_dir)
 
         # =======================================
         # Run model
@@ -152,7 +176,9 @@ def find_cases() -> list:
     """
     cases = list()
     if CASES_DIR.is_dir():
-        cases = [f for f in CASES_DIR.iterdir() if f.is_dir() and f.name.startswith("Case")]
+        with os.scandir(CASES_DIR) as it:
+            # Note: The name is checked first, so that non-case entries skip is_dir()
+            cases = [Path(e.path) for e in it if e.name[:4] == "Case" and e.is_dir()]
     cases.sort()
     return cases
 
@@ -222,32 +248,43 @@ def dump_mock_data_in_db(case_dir: Path) -> list[str]:
         return table_names
 
     database_json_dir = database_dir.joinpath("_Database.json")
-    with open(database_json_dir) as f:
-        database_json = json.load(f)
+    database_json = _load_json(database_json_dir)
 
-    timestamp_unix = int(datetime.now().timestamp() * 1000)
+    timestamp_unix = time.time_ns() // 1_000_000
 
     # Prepare mock data and settings. Note: We do not create the database tables in the same
     # step, to reduce the risk that tables are created and the code fails before they get deleted.
+    schema_prefix = f"[{DET_DB_SCHEMA}]."
     mock_data = list()
     for d in database_json:
         # Define temporary table name
         table_name = f"{d['table_name']}_{timestamp_unix}"
 
         # Load mock data
-        df = pd.read_parquet(database_dir.joinpath(d["filename"]))
+        df = pd.read_parquet(
+            database_dir.joinpath(d["filename"]), engine="pyarrow", memory_map=True
+        )
 
         # Store table name in environment variable, so the model can access it
-        os.environ[d["env_variable"]] = f"[{DET_DB_SCHEMA}].[{table_name}]"
-
-        # Store mock data and settings
-        mock_data.append(dict(table_name=table_name, data=df))
-
-    db = DetDatabase()
+        os.environ[d["env_variable"]] = schema_prefix + f"[{table_name}]"
+
+        # Store mock data and settings, as (table name, data) tuples
+        mock_data.append((table_name, df))
+
+    # Create database tables concurrently. Note: DetDatabase does not expose transactions, but
+    # its SQLAlchemy engine pools connections, so independent tables can be written in parallel.
+    db = _get_db()
+    with ThreadPoolExecutor(max_workers=MAX_DB_WORKERS) as executor:
+        futures = [
+            executor.submit(db.add_table, df=df, table_name=table_name, schema=DET_DB_SCHEMA)
+            for table_name, df in mock_data
+        ]
+
+    # Exiting the executor waits for all tables, so the successfully created ones are known
+    table_names = [name for (name, _), f in zip(mock_data, futures) if f.exception() is None]
     try:
-        for md in mock_data:
-            db.add_table(df=md["data"], table_name=md["table_name"], schema=DET_DB_SCHEMA)
-            table_names.append(md["table_name"])
+        for f in futures:
+            f.result()
     except Exception as e:
         # If code fails, remove mock data from database before raising the error
         remove_mock_data_from_db(table_names)
@@ -264,11 +301,25 @@ def remove_mock_data_from_db(table_names: list[str]):
         table_names: List of table names containing the mock data
     """
     if len(table_names) > 0:
-        db = DetDatabase()
+        db = _get_db()
         for t in table_names:
             db.remove_table(table_name=t, schema=DET_DB_SCHEMA)
 
 
+def _get_db() -> DetDatabase:
+    """
+    Returns the shared DetDatabase instance, creating it on the first call. Reusing a single
+    instance lets all test cases share the same SQLAlchemy engine and its connection pool.
+
+    Returns:
+        Shared DetDatabase instance
+    """
+    global _DB
+    if _DB is None:
+        _DB = DetDatabase()
+    return _DB
+
+
 def copy_outputs(src: Path, dst: Path):
     """
     Copies output files and sub-folders from a source directory to a destination directory.
@@ -280,28 +331,31 @@ def copy_outputs(src: Path, dst: Path):
     # Hard-coded extensions that should not be copied
     extensions_to_ignore = [".html"]
 
-    # Clear destination directory
-    if dst.is_dir():
+    # Clear destination directory. Note: Removing the directory directly, instead of checking
+    # first whether it exists, saves a stat call when it does exist.
+    try:
         shutil.rmtree(dst)
-    dst.mkdir(parents=True, exist_ok=True)
+    except FileNotFoundError:
+        pass
+    dst.mkdir(parents=True)
 
-    # Loop over files and sub-folders located in source directory
-    for root, _, filenames in os.walk(src):
-        # Define root in destination directory
-        dir_suffix = Path(root).relative_to(src)
-        dst_root = dst.joinpath(dir_suffix)
+    # Destination folders created so far, to avoid creating the same folder once per file
+    created_dirs = {str(dst)}
 
-        for f in filenames:
-            # Define file path in source directory and destination directory
-            src_file_dir = Path(root).joinpath(f)
-            dst_file_dir = dst_root.joinpath(f)
+    # Loop over files located in source directory and its sub-folders
+    for dir_suffix, entry in _scandir_recursive(src):
+        if os.path.splitext(entry.name)[1] not in extensions_to_ignore:
+            # Define file path in destination directory
+            dst_file_dir = os.path.join(dst, dir_suffix)
 
-            if src_file_dir.suffix not in extensions_to_ignore:
-                # Create destination folder (only if extension is not ignored)
-                dst_root.mkdir(parents=True, exist_ok=True)
+            # Create destination folder (only if extension is not ignored)
+            dst_root = os.path.dirname(dst_file_dir)
+            if dst_root not in created_dirs:
+                os.makedirs(dst_root, exist_ok=True)
+                created_dirs.add(dst_root)
 
-                # Copy file
-                shutil.copy2(src=src_file_dir, dst=dst_file_dir)
+            # Copy file
+            shutil.copyfile(src=entry.path, dst=dst_file_dir)
 
 
 def compare_outputs(expected_outputs_base_dir: Path, outputs_base_dir: Path):
@@ -315,41 +369,107 @@ def compare_outputs(expected_outputs_base_dir: Path, outputs_base_dir: Path):
     Raises:
         Exception: Raises an error if the file assertion fails
     """
-    # Loop over files and sub-folders located the expected outputs folder
-    for root, _, filenames in os.walk(expected_outputs_base_dir):
-        for f in filenames:
-            # Define path in expected outputs folder
-            expected_output_file_dir = Path(root).joinpath(f)
+    # Collect files located in the expected outputs folder and its sub-folders
+    file_pairs = list()
+    for expected_output_file_dir, dir_suffix in _list_expected_files(expected_outputs_base_dir):
+        # Define path in model outputs folder
+        output_file_dir = os.path.join(outputs_base_dir, dir_suffix)
+
+        print(f"Asserting output file: '{dir_suffix}'")
+        file_pairs.append(FilePair(output_file_dir, expected_output_file_dir, dir_suffix))
 
-            # Define path in model outputs folder
-            dir_suffix = expected_output_file_dir.relative_to(expected_outputs_base_dir)
-            output_file_dir = outputs_base_dir.joinpath(dir_suffix)
+    # Assert output files concurrently (file reading and parsing is mostly I/O-bound)
+    with ThreadPoolExecutor(max_workers=MAX_ASSERTION_WORKERS) as executor:
+        try:
+            list(executor.map(_assert_file_pair, file_pairs))
+        except Exception as e:
+            # Cancel pending assertions and remove outputs folder, then raise the original
+            # exception
+            executor.shutdown(cancel_futures=True)
+            shutil.rmtree(outputs_base_dir)
+            raise e
 
-            print(f"Asserting output file: '{dir_suffix}'")
 
-            # Assert output file
-            try:
-                assert_file(output_file_dir, expected_output_file_dir)
-            except Exception as e:
-                # Remove outputs folder, then raise the original exception
-                shutil.rmtree(outputs_base_dir)
-                raise e
+def _assert_file_pair(file_pair: FilePair):
+    """
+    Asserts a single output file, and identifies the file in the raised error. Since files are
+    asserted concurrently, the printed log lines do not reveal which file failed.
+
+    Args:
+        file_pair: Output file and corresponding expected output file
+
+    Raises:
+        Exception: Raises the original error if the file assertion fails, with a note naming
+            the output file
+    """
+    try:
+        assert_file(file_pair)
+    except Exception as e:
+        message = f"Assertion failed for output file: '{file_pair.dir_suffix}'"
+        print(message)
+        e.add_note(message)
+        raise
 
 
-def assert_file(output_file_dir: Path, expected_output_file_dir: Path):
+def _list_expected_files(expected_outputs_base_dir: Path):
+    """
+    Iterates over the files located in an expected outputs folder and its sub-folders.
+
+    Args:
+        expected_outputs_base_dir: Expected outputs folder directory
+
+    Yields:
+        Tuples containing the file path, and the file path relative to the expected outputs
+        folder
+    """
+    for dir_suffix, entry in _scandir_recursive(expected_outputs_base_dir):
+        yield entry.path, dir_suffix
+
+
+def _scandir_recursive(path: Path | str, rel_dir: str = ""):
+    """
+    Recursively iterates over the files located in a directory and its sub-folders. Symbolic
+    links to directories are not followed. Like os.walk(), a directory that does not exist is
+    treated as empty (e.g. an expected outputs folder that only contained ignored files, and
+    was therefore not tracked by git).
+
+    Args:
+        path: Directory to iterate over
+        rel_dir: Path of the directory, relative to the top-level directory of the iteration
+
+    Yields:
+        Tuples containing the file path relative to the top-level directory, and the
+        corresponding os.DirEntry object
+    """
+    try:
+        it = os.scandir(path)
+    except FileNotFoundError:
+        return
+
+    with it:
+        for entry in it:
+            rel_path = os.path.join(rel_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scandir_recursive(entry.path, rel_path)
+            elif entry.is_file():
+                yield rel_path, entry
+
+
+def assert_file(file_pair: FilePair):
     """
     Entry point function to assert that an output file is equal to the corresponding expected
     output file. Depending on the file extension, the procedure to open and assert the files
     will differ.
 
     Args:
-        output_file_dir: Output file directory
-        expected_output_file_dir: Expected output file directory
+        file_pair: Output file and corresponding expected output file
 
     Raises:
         ValueError: Raises an error if the file extension is not supported
     """
-    extension = expected_output_file_dir.suffix
+    output_file_dir = file_pair.output_file_dir
+    expected_output_file_dir = file_pair.expected_output_file_dir
+    extension = os.path.splitext(expected_output_file_dir)[1]
     if extension == ".csv":
         assert_csv(output_file_dir, expected_output_file_dir)
     elif extension == ".json":
@@ -364,7 +484,7 @@ def assert_file(output_file_dir: Path, expected_output_file_dir: Path):
         raise ValueError(f"File extension '{extension}' is not supported.")
 
 
-def assert_csv(output_file_dir: Path, expected_output_file_dir: Path):
+def assert_csv(output_file_dir: str, expected_output_file_dir: str):
     """
     Imports an output csv file and asserts that it is equal to the corresponding expected
     output csv file.
@@ -373,6 +493,11 @@ def assert_csv(output_file_dir: Path, expected_output_file_dir: Path):
         output_file_dir: Output file directory
         expected_output_file_dir: Expected output file directory
     """
+    # Fast path: byte-identical files are equal, without having to parse them. Note: filecmp
+    # compares file sizes first, so files of different sizes are not read.
+    if filecmp.cmp(output_file_dir, expected_output_file_dir, shallow=False):
+        return
+
     data = pd.read_csv(output_file_dir)
     expected_data = pd.read_csv(expected_output_file_dir)
     pd.testing.assert_frame_equal(
@@ -380,7 +505,7 @@ def assert_csv(output_file_dir: Path, expected_output_file_dir: Path):
     )
 
 
-def assert_json(output_file_dir: Path, expected_output_file_dir: Path):
+def assert_json(output_file_dir: str, expected_output_file_dir: str):
     """
     Imports an output json file and asserts that it is equal to the corresponding expected
     output json file.
@@ -389,14 +514,29 @@ def assert_json(output_file_dir: Path, expected_output_file_dir: Path):
         output_file_dir: Output file directory
         expected_output_file_dir: Expected output file directory
     """
-    with open(output_file_dir) as f:
-        data = json.load(f)
-    with open(expected_output_file_dir) as f:
-        expected_data = json.load(f)
+    # Fast path: byte-identical files are equal, without having to parse them
+    if filecmp.cmp(output_file_dir, expected_output_file_dir, shallow=False):
+        return
+
+    data = _load_json(output_file_dir)
+    expected_data = _load_json(expected_output_file_dir)
     assert data == expected_data
 
 
-def assert_npz(output_file_dir: Path, expected_output_file_dir: Path):
+def _load_json(file_dir: Path | str):
+    """
+    Reads a json file in a single call and parses it.
+
+    Args:
+        file_dir: File directory
+
+    Returns:
+        Parsed content of the json file
+    """
+    return json.loads(Path(file_dir).read_bytes())
+
+
+def assert_npz(output_file_dir: str, expected_output_file_dir: str):
     """
     Imports an output npz file and asserts that it is equal to the corresponding expected
     output npz file.
@@ -408,13 +548,26 @@ def assert_npz(output_file_dir: Path, expected_output_file_dir: Path):
     Raises:
         KeyError: Raises an error when the keys of the npz archive files do not match.
     """
-    data = np.load(output_file_dir)
-    expected_data = np.load(expected_output_file_dir)
-    if set(data.files) != set(expected_data.files):
-        raise KeyError("The .npz archives have different keys.")
-    else:
-        # Compare all files in archives
-        for name in expected_data.files:
-            np.testing.assert_allclose(
-                data[name], expected_data[name], atol=ABSOLUTE_TOLERANCE, rtol=RELATIVE_TOLERANCE
-            )
+    # Note: Archive members are only decompressed when accessed. Members are therefore loaded one
+    # at a time, so that at most one pair of arrays is held in memory, and members following a
+    # failing one are never loaded.
+    with np.load(output_file_dir) as data, np.load(expected_output_file_dir) as expected_data:
+        if set(data.files) != set(expected_data.files):
+            raise KeyError("The .npz archives have different keys.")
+        else:
+            # Compare all files in archives
+            for name in expected_data.files:
+                array = data[name]
+                expected_array = expected_data[name]
+
+                # Fast path: identical arrays are equal, without computing the tolerance check
+                is_identical = (
+                    array.shape == expected_array.shape
+                    and array.dtype == expected_array.dtype
+                    and np.array_equal(array, expected_array)
+                )
+                if not is_identical:
+                    np.testing.assert_allclose(
+                        array, expected_array, atol=ABSOLUTE_TOLERANCE, rtol=RELATIVE_TOLERANCE
+                    )
+                del array, expected_array
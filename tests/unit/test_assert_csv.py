@@ -0,0 +1,71 @@
+import warnings
+
+import pytest
+
+from tests.snapshots import test_snapshots as snapshots
+
+
+def _write_csv_files(tmp_path, content, expected_content):
+    output_file_dir = tmp_path.joinpath("output.csv")
+    expected_output_file_dir = tmp_path.joinpath("expected.csv")
+    output_file_dir.write_text(content)
+    expected_output_file_dir.write_text(expected_content)
+    return str(output_file_dir), str(expected_output_file_dir)
+
+
+@pytest.mark.parametrize(
+    "content, expected_content",
+    [
+        (",0,1\n0,1,2\n1,3,4\n", ",0,1\n0,1,2\n1,3,4\n"),
+        (",0,1\n0,1.0,2.0\n", ",0,1\n0,1.000000000001,2.0\n"),
+        (",0,1\n0,nan,2.0\n", ",0,1\n0,NaN,2.00\n"),
+        (",0,1\n0,inf,-inf\n", ",0,1\n0,inf,-inf\n"),
+    ],
+    ids=["identical", "within_tolerance", "nan", "inf"],
+)
+def test_assert_csv_equal(tmp_path, content, expected_content):
+    files = _write_csv_files(tmp_path, content, expected_content)
+    snapshots.assert_csv(*files)
+
+
+@pytest.mark.parametrize(
+    "content, expected_content",
+    [
+        (",0,1\n0,1,2\n", ",0,1\n0,1.0,2.0\n"),
+        (",0,1\n0,1.0,2.0\n", ",0,1\n0,1.1,2.0\n"),
+        (",0,1\n0,nan,2.0\n", ",0,1\n0,1.0,2.0\n"),
+        (",0,1\n0,inf,2.0\n", ",0,1\n0,-inf,2.0\n"),
+        (",0,1\n0,inf,-inf \n", ",0,1\n0,inf,-inf\n"),
+        (",0,1\n0,1,2\n#1,2\n", ",0,1\n0,1,2\n"),
+        (",0\n0,1_000\n", ",0\n0,1000\n"),
+    ],
+    ids=[
+        "int_vs_float",
+        "outside_tolerance",
+        "nan_vs_number",
+        "inf_vs_minus_inf",
+        "inf_trailing_space",
+        "comment_row",
+        "digit_separator",
+    ],
+)
+def test_assert_csv_different(tmp_path, content, expected_content):
+    files = _write_csv_files(tmp_path, content, expected_content)
+    with pytest.raises(AssertionError):
+        snapshots.assert_csv(*files)
+
+
+def test_assert_csv_header_only(tmp_path):
+    files = _write_csv_files(tmp_path, ",a,b\n", ",a,b")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        snapshots.assert_csv(*files)
+
+
+def test_assert_csv_non_numeric(tmp_path):
+    files = _write_csv_files(tmp_path, ",a,b\n0,x,1.0\n", ",a,b\n0,x,1.00\n")
+    snapshots.assert_csv(*files)
+
+    files = _write_csv_files(tmp_path, ",a,b\n0,x,1.0\n", ",a,b\n0,y,1.0\n")
+    with pytest.raises(AssertionError):
+        snapshots.assert_csv(*files)